@@ -1,6 +1,7 @@
 #!/usr/bin/python
 import xml.etree.ElementTree as ET
 import argparse
+import fnmatch
 import subprocess
 import sys
 
@@ -13,6 +14,11 @@ NODE_TYPE_LIST      = 'list'
 NODE_TYPE_LEAFLIST  = 'leaf-list'
 NODE_TYPE_USES      = 'uses'
 
+# Path filter results
+PATH_PRUNED   = 0
+PATH_ANCESTOR = 1
+PATH_RETAINED = 2
+
 # Conversion from YANG types to C++ types
 YangTypeConversion = {
     'int8'   : 'int8_t',
@@ -36,6 +42,20 @@ def yangName2ClassName(yangName):
 def yangName2VarName(yangName):
     return yangName.lower().replace('-', '_') + '_'
 
+####################################################################################################
+## Retrieve the key name of a list
+# @param  xmlElem  XML element of the list
+# return  The key name or an empty string if the element has no key
+def getListKeyName(xmlElem):
+    for prop in xmlElem:
+        propTag = prop.tag.split('}')
+        propTag = propTag[len(propTag) - 1]
+
+        if propTag == 'key':
+            return prop.attrib['value']
+
+    return ''
+
 ####################################################################################################
 ## Generic node representation
 class Node(object):
@@ -270,17 +290,7 @@ class List(Container):
     # @param  path     The path of the leaf
     def __init__(self, xmlElem, path):
         super(List, self).__init__(xmlElem, path)
-        # Get key
-        keyName = ''
-        for prop in xmlElem:
-            propTag = prop.tag.split('}')
-            propTag = propTag[len(propTag) - 1]
-
-            if propTag == 'key':
-                keyName = prop.attrib['value']
-                break
-
-        self.keyName = keyName
+        self.keyName = getListKeyName(xmlElem)
 
     ################################################################################################
     ## Add a child to the current node instead of the child is the key
@@ -317,7 +327,7 @@ class Augment(Container):
     # @param  xmlElem  XML Element representing the leaf to be created
     # @param  path     The path of the leaf
     def __init__(self, xmlElem, path):
-        super(Augment, self).__init__(xmlElem, xmlElem.attrib['target-node'] + '/')
+        super(Augment, self).__init__(xmlElem, path)
         self.name = xmlElem.attrib['target-node'][1:].title().replace(":", "_").replace("-", "_")\
                     .replace("/", "__")
 
@@ -449,36 +459,216 @@ PropertiesToHandler = {
 }
 
 ####################################################################################################
-## Create a node
+## Retrieve the path a node would have, without creating it
 # @param  xmlElem  XML element
 # @param  path     Base path
-# return  The created node
-def createNode(xmlElem, path):
+# return  The node path or None if the element is not a data node
+def getNodePath(xmlElem, path):
     tag = xmlElem.tag.split('}')
     tag = tag[len(tag) - 1]
 
     if not (tag in DataNodeTypes):
         return None
 
-    currentPath = ''
+    if tag == NODE_TYPE_AUGMENT:
+        return xmlElem.attrib['target-node'] + '/'
+
     if 'name' in xmlElem.attrib:
-        currentPath = path + xmlElem.attrib['name'] + '/'
+        return path + xmlElem.attrib['name'] + '/'
+
+    return ''
+
+####################################################################################################
+## Create a node
+# @param  xmlElem  XML element
+# @param  path     Base path
+# return  The created node
+def createNode(xmlElem, path):
+    currentPath = getNodePath(xmlElem, path)
+    if currentPath == None:
+        return None
+
+    tag = xmlElem.tag.split('}')
+    tag = tag[len(tag) - 1]
     node = DataNodeTypes[tag](xmlElem, currentPath)
 
     return node
 
+####################################################################################################
+## Filter that decides which paths of the schema must be converted
+class PathFilter(object):
+
+    ################################################################################################
+    ## Constructor
+    # @param  self      The current object
+    # @param  includes  List of path patterns to be converted. If empty, everything is converted
+    # @param  excludes  List of path patterns to be skipped, including their subtrees
+    # @param  prefix    Prefix of the converted module. Patterns may use it for the module nodes
+    def __init__(self, includes, excludes, prefix = ''):
+        self.includePatterns = includes
+        self.excludePatterns = excludes
+        self.includes = [PathFilter.splitPath(pattern) for pattern in includes]
+        self.excludes = [PathFilter.splitPath(pattern) for pattern in excludes]
+        self.matchedIncludes = set()
+        self.matchedExcludes = set()
+        self.keyExcludes = set()
+        self.prefix = prefix
+
+    ################################################################################################
+    ## Split a path in its components
+    # @param  path  Path to be split
+    # return  List of path components
+    @staticmethod
+    def splitPath(path):
+        return [comp for comp in path.strip().split('/') if comp != '']
+
+    ################################################################################################
+    ## Check if a path component matches a pattern component. If the pattern has no module prefix,
+    ## the prefix of the path component is ignored. If the pattern has the prefix of the converted
+    ## module, it also matches the module nodes, whose path components have no prefix
+    # @param  self         The current object
+    # @param  patternComp  Pattern component, which may contain shell-style wildcards
+    # @param  pathComp     Path component
+    # return  True if it matches, False otherwise
+    def matchComponent(self, patternComp, pathComp):
+        if fnmatch.fnmatchcase(pathComp, patternComp):
+            return True
+
+        if not (':' in patternComp):
+            return fnmatch.fnmatchcase(pathComp.split(':')[-1], patternComp)
+
+        localPrefix = self.prefix + ':'
+        if self.prefix != '' and patternComp.startswith(localPrefix) and not (':' in pathComp):
+            return fnmatch.fnmatchcase(pathComp, patternComp[len(localPrefix):])
+
+        return False
+
+    ################################################################################################
+    ## Check if the first components of a path match a pattern
+    # @param  self     The current object
+    # @param  pattern  Pattern components
+    # @param  path     Path components
+    # return  True if the common leading components match, False otherwise
+    def matchPrefix(self, pattern, path):
+        for patternComp, pathComp in zip(pattern, path):
+            if not self.matchComponent(patternComp, pathComp):
+                return False
+
+        return True
+
+    ################################################################################################
+    ## Check what must be done with the node of a given path
+    # @param  self  The current object
+    # @param  path  Node path
+    # return  PATH_PRUNED if the node must not be created, PATH_RETAINED if the node and its
+    #         subtree must be created or PATH_ANCESTOR if the node is only needed to reach an
+    #         included path
+    def check(self, path):
+        comps = PathFilter.splitPath(path)
+
+        for pattern in self.excludes:
+            if len(pattern) <= len(comps) and self.matchPrefix(pattern, comps):
+                return PATH_PRUNED
+
+        if not self.includes:
+            return PATH_RETAINED
+
+        result = PATH_PRUNED
+        for pattern in self.includes:
+            if not self.matchPrefix(pattern, comps):
+                continue
+
+            if len(pattern) <= len(comps):
+                return PATH_RETAINED
+
+            result = PATH_ANCESTOR
+
+        return result
+
+    ################################################################################################
+    ## Iterate over the whole XML element recording which patterns match its nodes. The filter
+    ## is not applied, so a pattern is matched even if its node is pruned by another pattern
+    # @param  self     The current object
+    # @param  xmlElem  XML element
+    # @param  path     Base path
+    # @param  keyName  Key name of the XML element, if it is a list
+    def matchSchema(self, xmlElem, path = '/', keyName = ''):
+        for child in xmlElem:
+            nodePath = getNodePath(child, path)
+            if nodePath == None:
+                continue
+
+            comps = PathFilter.splitPath(nodePath)
+            for index, pattern in enumerate(self.includes):
+                if len(pattern) <= len(comps) and self.matchPrefix(pattern, comps):
+                    self.matchedIncludes.add(index)
+
+            # Excluding a list key has no effect, since keys are always kept
+            isKey = keyName != '' and 'name' in child.attrib and child.attrib['name'] == keyName
+            for index, pattern in enumerate(self.excludes):
+                if len(pattern) <= len(comps) and self.matchPrefix(pattern, comps):
+                    if isKey:
+                        self.keyExcludes.add(index)
+                    else:
+                        self.matchedExcludes.add(index)
+
+            self.matchSchema(child, nodePath, getListKeyName(child))
+
+    ################################################################################################
+    ## Retrieve the patterns that did not match any node of the schema
+    # @param  self  The current object
+    # return  List of patterns that never matched
+    def getUnmatchedPatterns(self):
+        unmatched = []
+        for index, pattern in enumerate(self.includePatterns):
+            if not (index in self.matchedIncludes):
+                unmatched.append(pattern)
+
+        for index, pattern in enumerate(self.excludePatterns):
+            if not (index in self.matchedExcludes) and not (index in self.keyExcludes):
+                unmatched.append(pattern)
+
+        return unmatched
+
+    ################################################################################################
+    ## Retrieve the exclude patterns that only match list keys, which are always kept
+    # @param  self  The current object
+    # return  List of ignored exclude patterns
+    def getIgnoredKeyPatterns(self):
+        ignored = []
+        for index, pattern in enumerate(self.excludePatterns):
+            if index in self.keyExcludes and not (index in self.matchedExcludes):
+                ignored.append(pattern)
+
+        return ignored
+
 ####################################################################################################
 ## Iterate over XML element recursively creating nodes
 # @param  parentNode  Parent node
 # @param  xmlElem     XML element
 # @param  path        Base path
-def iterateOverNode(parentNode, xmlElem, path = '/'):
+# @param  pathFilter  Filter of the paths to be created. If None, all nodes are created
+# return  True if a node matching the filter was created, False otherwise
+def iterateOverNode(parentNode, xmlElem, path = '/', pathFilter = None):
+    found = False
     for child in xmlElem:
 
+        status = PATH_RETAINED
+        isKey = False
+        if pathFilter != None:
+            nodePath = getNodePath(child, path)
+            if nodePath != None:
+                status = pathFilter.check(nodePath)
+
+                # The key of a list is always needed by the list itself
+                isKey = isinstance(parentNode, List) and 'name' in child.attrib\
+                        and child.attrib['name'] == parentNode.keyName
+
+                if status == PATH_PRUNED and not isKey:
+                    continue
+
         node = createNode(child, path)
-        if node != None:
-            parentNode.addChildNode(node)
-        else:
+        if node == None:
             tag = child.tag.split('}')
             tag = tag[len(tag) - 1]
 
@@ -487,7 +677,55 @@ def iterateOverNode(parentNode, xmlElem, path = '/'):
 
             continue
 
-        iterateOverNode(node, child, node.getPath())
+        childFound = iterateOverNode(node, child, node.getPath(), pathFilter)
+
+        # Nodes only needed to reach included paths are dropped if nothing was found below them
+        if status == PATH_ANCESTOR and not childFound and not isKey:
+            continue
+
+        parentNode.addChildNode(node)
+
+        # Keys kept only because of their list are not a match
+        if status == PATH_RETAINED or childFound:
+            found = True
+
+    return found
+
+####################################################################################################
+## Retrieve the prefix of a module
+# @param  xmlElem  XML element of the module
+# return  The module prefix or an empty string if it is not found
+def getModulePrefix(xmlElem):
+    for prop in xmlElem:
+        propTag = prop.tag.split('}')
+        propTag = propTag[len(propTag) - 1]
+
+        if propTag == 'prefix':
+            return prop.attrib['value']
+
+    return ''
+
+####################################################################################################
+## Read a manifest of used paths
+# @param  fileName  Manifest file name. It has one path pattern per line and '#' starts a comment
+# return  List of path patterns
+def readManifest(fileName):
+    patterns = []
+    try:
+        f = open(fileName, 'r')
+        for line in f:
+            line = line.split('#')[0].strip()
+            if line != '':
+                patterns.append(line)
+        f.close()
+    except IOError:
+        sys.exit("Error reading manifest file: " + fileName)
+
+    # An empty manifest would mean that the whole module is converted, not that nothing is used
+    if not patterns:
+        sys.exit("Error, no paths in manifest file: " + fileName)
+
+    return patterns
 
 ####################################################################################################
 
@@ -502,9 +740,25 @@ parser.add_argument('-d', '--output-directory', type=str, metavar='DIR',
 parser.add_argument('-p', '--path', type=str, metavar='PATH1:PATH2', action='append',
                     help='path is a colon (:) separated list of directories to search for imported '
                          'modules. This option may be given multiple times.')
+parser.add_argument('-i', '--include', type=str, metavar='PATH', action='append', default=[],
+                    help='Path pattern of a subtree to be converted. Only the included subtrees '
+                         'are converted, the default is the whole module. Shell-style wildcards '
+                         'may be used in each path component. This option may be given multiple '
+                         'times.')
+parser.add_argument('-e', '--exclude', type=str, metavar='PATH', action='append', default=[],
+                    help='Path pattern of a subtree to be skipped. List keys are always kept. '
+                         'This option may be given multiple times.')
+parser.add_argument('-m', '--manifest', type=str, metavar='FILE', action='append', default=[],
+                    help='File with the used paths, one pattern per line. Each pattern is handled '
+                         'as an --include. This option may be given multiple times.')
 parser.add_argument('input', type=str, help='YANG file to be converted.')
 args = parser.parse_args()
 
+# Read path filter patterns
+includes = list(args.include)
+for manifest in args.manifest:
+    includes += readManifest(manifest)
+
 # Mount pybot command
 cmd = ["pyang", args.input, "-f", "yin", "-o", args.input + ".xml"]
 if args.path:
@@ -519,9 +773,23 @@ if subprocess.call(cmd) != 0:
 tree = ET.parse(args.input + ".xml")
 root = tree.getroot()
 
+# Mount path filter
+pathFilter = None
+if includes or args.exclude:
+    pathFilter = PathFilter(includes, args.exclude, getModulePrefix(root))
+
 # Parse it
 rootNode = createNode(root, '')
-iterateOverNode(rootNode, root)
+iterateOverNode(rootNode, root, '/', pathFilter)
+
+# Warn about patterns that did not match anything, since they are probably typos
+if pathFilter != None:
+    pathFilter.matchSchema(root)
+    for pattern in pathFilter.getUnmatchedPatterns():
+        sys.stderr.write('Warning: path pattern does not match any node: ' + pattern + '\n')
+    for pattern in pathFilter.getIgnoredKeyPatterns():
+        sys.stderr.write('Warning: path pattern ignored, list keys are always kept: ' + pattern\
+                         + '\n')
 
 
 header = '/**************************************************************************************'\